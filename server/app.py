@@ -1,15 +1,25 @@
 from __future__ import annotations
 
+import asyncio
 import sqlite3
-from fastapi import FastAPI, HTTPException, Query
+import threading
+
+import orjson
+from fastapi import FastAPI, HTTPException, Query, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse
 
-from db import connect, apply_migrations
+from db import connect, connect_readonly, apply_migrations
 from seed import seed
 from simulator import TelemetrySimulator
 from models import Machine, Metric, LatestReading, ReadingPoint
 
-app = FastAPI(title="Telemetry Server", version="0.1.0")
+app = FastAPI(
+    title="Telemetry Server",
+    version="0.1.0",
+    default_response_class=ORJSONResponse,
+)
 
 # (Optional) If you ever run a web UI on a different port, CORS helps.
 app.add_middleware(
@@ -20,23 +30,77 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-_conn: sqlite3.Connection | None = None
+# A 5000-point /history payload is ~120 KB of highly repetitive JSON;
+# gzip cuts it 5-10x for remote clients. Tiny responses (/machines,
+# /metrics, /latest) fall under minimum_size and pass through untouched.
+app.add_middleware(GZipMiddleware, minimum_size=1024, compresslevel=5)
+
+_conn: sqlite3.Connection | None = None  # sole writer; handed to the simulator
 _sim: TelemetrySimulator | None = None
+_reader_local = threading.local()
+
+# machines/metrics come from seed() and never change afterwards, so their
+# JSON payloads are rendered once at startup and served as cached bytes.
+_machines_json: bytes | None = None
+_metrics_json: bytes | None = None
+
+# Fixed SQL for the hot read endpoints. Issuing the exact same string on every
+# request lets sqlite3's internal statement cache skip re-preparing the query.
+_SQL_MACHINES = "SELECT machine_id, name, location, status FROM machines ORDER BY machine_id"
+_SQL_METRICS = "SELECT metric_key, display_name, unit FROM metrics ORDER BY metric_key"
+_SQL_MACHINE_EXISTS = "SELECT 1 FROM machines WHERE machine_id = ?"
+_SQL_LATEST = """
+    SELECT machine_id, metric_key, ts_ms, value
+    FROM latest_readings
+    WHERE machine_id = ?
+    ORDER BY metric_key
+"""
+
+# /history has four shapes depending on which time bounds are present.
+# Canonicalize them up front (keyed by (has_start, has_end)) instead of
+# rebuilding the WHERE clause per request, so each variant stays cacheable.
+# The inner query walks the composite index newest-first to apply LIMIT; the
+# outer ORDER BY hands rows back ascending for charting, saving a Python-side
+# list reversal per request.
+_SQL_HISTORY = {
+    (has_start, has_end): f"""
+        SELECT ts_ms, value FROM (
+            SELECT ts_ms, value
+            FROM readings
+            WHERE machine_id = ? AND metric_key = ?
+            {"AND ts_ms >= ?" if has_start else ""}
+            {"AND ts_ms <= ?" if has_end else ""}
+            ORDER BY ts_ms DESC
+            LIMIT ?
+        )
+        ORDER BY ts_ms ASC
+    """
+    for has_start in (False, True)
+    for has_end in (False, True)
+}
 
 
 @app.on_event("startup")
 def on_startup() -> None:
-    global _conn, _sim
+    global _conn, _sim, _machines_json, _metrics_json
     _conn = connect()
     apply_migrations(_conn)
     seed(_conn)
+    _machines_json = orjson.dumps([dict(r) for r in _conn.execute(_SQL_MACHINES)])
+    _metrics_json = orjson.dumps([dict(r) for r in _conn.execute(_SQL_METRICS)])
     _sim = TelemetrySimulator(_conn)
 
 
 def conn() -> sqlite3.Connection:
-    if _conn is None:
-        raise RuntimeError("DB not initialized")
-    return _conn
+    # One read-only connection per threadpool worker. Sharing the writer
+    # would serialize every endpoint on sqlite3's per-connection mutex;
+    # with WAL, N readers can run alongside the single writer.
+    c = getattr(_reader_local, "c", None)
+    if c is None:
+        if _conn is None:
+            raise RuntimeError("DB not initialized")
+        c = _reader_local.c = connect_readonly()
+    return c
 
 
 def sim() -> TelemetrySimulator:
@@ -45,79 +109,81 @@ def sim() -> TelemetrySimulator:
     return _sim
 
 
-@app.get("/machines", response_model=list[Machine])
-def get_machines() -> list[Machine]:
-    rows = conn().execute(
-        "SELECT machine_id, name, location, status FROM machines ORDER BY machine_id"
-    ).fetchall()
-    return [Machine(**dict(r)) for r in rows]
+# The pydantic models are kept in `responses=` so OpenAPI still documents the
+# payload shapes, but the endpoints serialize plain dicts straight through
+# orjson — no jsonable_encoder pass and no per-row model validation.
+# Endpoints are async so the event loop stays free to pipeline requests;
+# only the blocking sqlite fetch (where there is one) is pushed to a worker
+# thread, where conn() hands that thread its own read-only connection.
+@app.get("/machines", responses={200: {"model": list[Machine]}})
+async def get_machines() -> Response:
+    return Response(_machines_json, media_type="application/json")
 
 
-@app.get("/metrics", response_model=list[Metric])
-def get_metrics() -> list[Metric]:
-    rows = conn().execute(
-        "SELECT metric_key, display_name, unit FROM metrics ORDER BY metric_key"
-    ).fetchall()
-    return [Metric(**dict(r)) for r in rows]
+@app.get("/metrics", responses={200: {"model": list[Metric]}})
+async def get_metrics() -> Response:
+    return Response(_metrics_json, media_type="application/json")
 
 
-@app.get("/latest", response_model=list[LatestReading])
-def get_latest(
+@app.get("/latest", responses={200: {"model": list[LatestReading]}})
+async def get_latest(
     machine_id: str = Query(..., description="e.g. m-001")
-) -> list[LatestReading]:
-    # Verify machine exists (nice error)
-    exists = conn().execute(
-        "SELECT 1 FROM machines WHERE machine_id = ?",
-        (machine_id,),
-    ).fetchone()
-    if not exists:
+) -> ORJSONResponse:
+    def fetch() -> list[tuple] | None:
+        c = conn()
+        # Verify machine exists (nice error)
+        if not c.execute(_SQL_MACHINE_EXISTS, (machine_id,)).fetchone():
+            return None
+        # Plain tuples here too: the column list is fixed, so positional
+        # indexing beats sqlite3.Row's per-row column bookkeeping.
+        cur = c.cursor()
+        cur.row_factory = None
+        return cur.execute(_SQL_LATEST, (machine_id,)).fetchall()
+
+    rows = await asyncio.to_thread(fetch)
+    if rows is None:
         raise HTTPException(status_code=404, detail="Unknown machine_id")
+    return ORJSONResponse(
+        [
+            {"machine_id": r[0], "metric_key": r[1], "ts_ms": r[2], "value": r[3]}
+            for r in rows
+        ]
+    )
 
-    rows = conn().execute(
-        """
-        SELECT machine_id, metric_key, ts_ms, value
-        FROM latest_readings
-        WHERE machine_id = ?
-        ORDER BY metric_key
-        """,
-        (machine_id,),
-    ).fetchall()
-    return [LatestReading(**dict(r)) for r in rows]
 
-
-@app.get("/history", response_model=list[ReadingPoint])
-def get_history(
+@app.get("/history", responses={200: {"model": list[ReadingPoint]}})
+async def get_history(
     machine_id: str = Query(...),
     metric_key: str = Query(...),
     start_ms: int | None = Query(None, description="epoch ms"),
     end_ms: int | None = Query(None, description="epoch ms"),
     limit: int = Query(500, ge=1, le=5000),
-) -> list[ReadingPoint]:
+) -> ORJSONResponse:
     params: list[object] = [machine_id, metric_key]
-
-    where = "WHERE machine_id = ? AND metric_key = ?"
     if start_ms is not None:
-        where += " AND ts_ms >= ?"
         params.append(start_ms)
     if end_ms is not None:
-        where += " AND ts_ms <= ?"
         params.append(end_ms)
 
-    rows = conn().execute(
-        f"""
-        SELECT ts_ms, value
-        FROM readings
-        {where}
-        ORDER BY ts_ms DESC
-        LIMIT ?
-        """,
-        (*params, limit),
-    ).fetchall()
-
-    # Return ascending for charting convenience
-    points = [ReadingPoint(**dict(r)) for r in rows]
-    points.reverse()
-    return points
+    sql = _SQL_HISTORY[(start_ms is not None, end_ms is not None)]
+
+    def fetch() -> list[dict]:
+        # Fetch plain tuples on a dedicated cursor: at limit=5000 the per-row
+        # sqlite3.Row bookkeeping (and dict(r) key iteration) dominates the
+        # query itself, and positional indexing skips all of it.
+        cur = conn().cursor()
+        cur.row_factory = None
+        cur.execute(sql, (*params, limit))
+
+        # Drain in fetchmany chunks rather than one fetchall, so peak memory
+        # stays bounded by the chunk size if the limit cap is ever raised,
+        # and SQLite paging overlaps with building the response.
+        points: list[dict] = []
+        while chunk := cur.fetchmany(1000):
+            points.extend({"ts_ms": ts, "value": v} for ts, v in chunk)
+        return points
+
+    return ORJSONResponse(await asyncio.to_thread(fetch))
 
 
 @app.post("/simulate/start")
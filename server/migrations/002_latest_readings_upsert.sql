@@ -0,0 +1,24 @@
+-- latest_readings is now maintained by the simulator's batched upsert
+-- (see simulator.py), so the per-row trigger on readings is redundant work.
+DROP TRIGGER IF EXISTS trg_readings_upsert_latest;
+
+-- Rebuild latest_readings WITHOUT ROWID: the primary key is the whole lookup
+-- key, so storing rows directly in the PK b-tree drops the rowid indirection
+-- for this narrow table.
+CREATE TABLE latest_readings_new (
+  machine_id   TEXT NOT NULL,
+  metric_key   TEXT NOT NULL,
+  ts_ms        INTEGER NOT NULL,
+  value        REAL NOT NULL,
+
+  PRIMARY KEY (machine_id, metric_key),
+
+  FOREIGN KEY (machine_id) REFERENCES machines(machine_id) ON DELETE CASCADE,
+  FOREIGN KEY (metric_key) REFERENCES metrics(metric_key) ON DELETE CASCADE
+) WITHOUT ROWID;
+
+INSERT INTO latest_readings_new
+SELECT machine_id, metric_key, ts_ms, value FROM latest_readings;
+
+DROP TABLE latest_readings;
+ALTER TABLE latest_readings_new RENAME TO latest_readings;
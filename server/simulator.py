@@ -1,11 +1,40 @@
 from __future__ import annotations
 
-import math
-import random
 import threading
 import time
 import sqlite3
 
+import numpy as np
+
+_INSERT_SQL_PREFIX = (
+    "INSERT OR IGNORE INTO readings(machine_id, metric_key, ts_ms, value) VALUES "
+)
+
+# Rows per multi-row INSERT are bucketed to powers of two so only O(log n)
+# distinct statements ever exist (keeping them statement-cache friendly).
+# 128 rows x 4 params stays well under SQLite's host-parameter limit.
+_MAX_INSERT_ROWS = 128
+
+# Keeps /latest a point lookup: same guard the old trigger used, but run once
+# per flushed batch instead of once per inserted row.
+_UPSERT_LATEST_SQL = """
+    INSERT INTO latest_readings(machine_id, metric_key, ts_ms, value)
+    VALUES (?,?,?,?)
+    ON CONFLICT(machine_id, metric_key) DO UPDATE SET
+      ts_ms = excluded.ts_ms,
+      value = excluded.value
+    WHERE excluded.ts_ms > latest_readings.ts_ms
+"""
+
+# Per-metric wave shape: (base, amplitude, 1/period, machine-phase weight,
+# noise scale, rectify). Unknown metric keys fall back to _DEFAULT_COEFFS.
+_METRIC_COEFFS: dict[str, tuple[float, float, float, float, float, bool]] = {
+    "temperature": (70.0, 5.0, 1.0 / 6.0, 1.0, 1.0, False),
+    "pressure": (101.3, 2.0, 1.0 / 4.0, 0.7, 0.3, False),
+    "vibration": (3.0, 1.5, 1.0 / 2.0, 1.0, 0.2, True),
+}
+_DEFAULT_COEFFS = (10.0, 1.0, 1.0, 1.0, 1.0, False)
+
 
 class TelemetrySimulator:
     def __init__(self, conn: sqlite3.Connection):
@@ -14,9 +43,17 @@ class TelemetrySimulator:
         self._stop = threading.Event()
         self._lock = threading.Lock()
         self._running = False
+        self._pending: list[tuple[str, str, int, float]] = []
+        self._last_flush = time.monotonic()
+        # Dedicated generator: the simulator thread owns it, so draws skip
+        # the module-level lock in `random`, and noise comes out batched.
+        self._rng = np.random.default_rng()
+        self._multi_insert_sql: dict[int, str] = {}
 
         # configurable
         self.interval_s = 0.5  # how often to emit telemetry
+        self.flush_rows = 200  # flush once this many rows accumulate...
+        self.flush_interval_s = 2.0  # ...or this much time has passed
 
     def is_running(self) -> bool:
         with self._lock:
@@ -46,43 +83,78 @@ class TelemetrySimulator:
         metrics = [row["metric_key"] for row in self._conn.execute("SELECT metric_key FROM metrics")]
 
         # Phase offsets so machines aren't identical
-        machine_phase = {m: random.random() * 10.0 for m in machines}
-        metric_phase = {k: random.random() * 10.0 for k in metrics}
-
+        mp = self._rng.uniform(0.0, 10.0, size=len(machines))
+        kp = self._rng.uniform(0.0, 10.0, size=len(metrics))
+
+        # Per-metric wave coefficients, stacked by metric position so the
+        # whole (machines x metrics) value matrix comes out of one NumPy
+        # expression per tick instead of O(M*K) Python calls.
+        coeffs = np.array([_METRIC_COEFFS.get(k, _DEFAULT_COEFFS) for k in metrics])
+        base, amp, inv_period, mp_weight, noise_scale, take_abs = coeffs.T
+        take_abs = take_abs.astype(bool)
+        pairs = [(m, k) for m in machines for k in metrics]
+
+        # Tick on absolute monotonic deadlines rather than sleeping a fixed
+        # interval after variable-time DB work, so the cadence doesn't drift
+        # under load. Event.wait also returns immediately on stop().
+        deadline = time.monotonic()
         while not self._stop.is_set():
+            deadline += self.interval_s
             now_ms = int(time.time() * 1000)
             t = time.time()
 
-            rows: list[tuple[str, str, int, float]] = []
-            for m in machines:
-                mp = machine_phase[m]
-                for k in metrics:
-                    kp = metric_phase[k]
-                    value = self._value_for(k, t, mp, kp)
-                    rows.append((m, k, now_ms, float(value)))
-
-            # One transaction per tick
-            with self._conn:
-                self._conn.executemany(
-                    "INSERT OR IGNORE INTO readings(machine_id, metric_key, ts_ms, value) VALUES (?,?,?,?)",
-                    rows,
+            phase = mp[:, None] * mp_weight[None, :] + kp[None, :]
+            wave = np.sin(t * inv_period[None, :] + phase)
+            wave = np.where(take_abs[None, :], np.abs(wave), wave)
+            noise = self._rng.uniform(-0.5, 0.5, size=(len(machines), len(metrics)))
+            vals = base[None, :] + amp[None, :] * wave + noise_scale[None, :] * noise
+
+            rows: list[tuple[str, str, int, float]] = [
+                (m, k, now_ms, v) for (m, k), v in zip(pairs, vals.ravel().tolist())
+            ]
+
+            # Accumulate and flush in batches so the write transaction
+            # (and the WAL writer lock it takes) is amortized across many
+            # ticks instead of taken every 500 ms.
+            self._pending.extend(rows)
+            if (
+                len(self._pending) >= self.flush_rows
+                or time.monotonic() - self._last_flush > self.flush_interval_s
+            ):
+                self._flush()
+
+            if self._stop.wait(max(0.0, deadline - time.monotonic())):
+                break
+
+        # Don't drop rows buffered since the last flush on shutdown.
+        self._flush()
+
+    def _flush(self) -> None:
+        if not self._pending:
+            return
+        with self._conn:
+            # Multi-row VALUES inserts bind the whole chunk in one statement
+            # step, instead of executemany's per-row rebind. Chunk greedily by
+            # the largest power of two that fits.
+            start = 0
+            remaining = len(self._pending)
+            while remaining:
+                size = 1
+                while size * 2 <= min(remaining, _MAX_INSERT_ROWS):
+                    size *= 2
+                chunk = self._pending[start : start + size]
+                self._conn.execute(
+                    self._insert_sql(size), [v for row in chunk for v in row]
                 )
-
-            time.sleep(self.interval_s)
-
-    def _value_for(self, metric_key: str, t: float, mp: float, kp: float) -> float:
-        # Smooth wave + noise. Tune ranges per metric.
-        noise = random.uniform(-0.5, 0.5)
-
-        if metric_key == "temperature":
-            base = 70.0 + 5.0 * math.sin((t / 6.0) + mp + kp)
-            return base + noise
-        if metric_key == "pressure":
-            base = 101.3 + 2.0 * math.sin((t / 4.0) + mp * 0.7 + kp)
-            return base + noise * 0.3
-        if metric_key == "vibration":
-            base = 3.0 + 1.5 * abs(math.sin((t / 2.0) + mp + kp))
-            return base + noise * 0.2
-
-        # Default generic metric
-        return 10.0 + math.sin(t + mp + kp) + noise
+                start += size
+                remaining -= size
+            self._conn.executemany(_UPSERT_LATEST_SQL, self._pending)
+        self._pending.clear()
+        self._last_flush = time.monotonic()
+
+    def _insert_sql(self, n_rows: int) -> str:
+        sql = self._multi_insert_sql.get(n_rows)
+        if sql is None:
+            sql = _INSERT_SQL_PREFIX + ",".join(["(?,?,?,?)"] * n_rows)
+            self._multi_insert_sql[n_rows] = sql
+        return sql